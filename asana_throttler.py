@@ -1,12 +1,17 @@
 from dataclasses import InitVar, dataclass, field
-import random
+from typing import ClassVar
+import logging
 import time
 import requests
-from throttlers.throttler import RequestThrottler
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from throttlers.throttler import RequestThrottler, full_jitter, json_dumps
 
 # If you are working with only one file, do not use the import statement above.
 # Instead, replace the import statement with the entire code snippet from the throttler.py file.
 
+logger = logging.getLogger(__name__)
+
 @dataclass
 class _AsanaThrottlerDefaultsBase:
     """
@@ -31,6 +36,8 @@ class AsanaThrottler(_AsanaThrottlerDefaultsBase, RequestThrottler, _AsanaThrott
     A specialized throttler for Asana API requests that handles multiple API keys and dynamically
     adjusts rate limits based on the rate-limit headers returned by Asana.
     """
+    _METHODS: ClassVar[frozenset] = frozenset({'GET', 'POST', 'PUT', 'PATCH', 'DELETE'})
+
     primary_api_key: InitVar[str]
     backup_api_keys: InitVar[list]
     current_api_key: str = field(init=False)
@@ -43,64 +50,76 @@ class AsanaThrottler(_AsanaThrottlerDefaultsBase, RequestThrottler, _AsanaThrott
         self.is_server_providing_request_position = False
         self.is_leaky_bucket = False
 
+        # Remount the base session's adapters with a retry policy: urllib3
+        # retries connection failures and 5xx responses inside the pool; 429s
+        # must surface to the Python-level key rotation, so Retry-After
+        # handling is disabled here — with it on, urllib3 retries any 429
+        # carrying a Retry-After header even when 429 is not in the forcelist,
+        # burning every retry on the exhausted key. The 429 loop below honors
+        # Retry-After itself. raise_on_status is off so an exhausted 5xx comes
+        # back as a response and raise_for_status surfaces the usual HTTPError.
+        retry = Retry(
+            total=self.backoff_retries,
+            backoff_factor=self.backoff_base_delay,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=self._METHODS,
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        self._set_auth(self.current_api_key)
+
+    def _set_auth(self, key):
+        """Precompute the Authorization header for the given key and install it on the session."""
+        self._auth_header = f'Bearer {key}'
+        self._session.headers['Authorization'] = self._auth_header
+
     def _switch_api_key(self):
         """Switch to a random backup API key when the current key is rate-limited."""
-        all_keys = [self.current_api_key] + self.backup_api_keys
-        available_keys = [key for key in all_keys if key != self.current_api_key]
-        if available_keys:
-            self.current_api_key = random.choice(available_keys)
+        if not self.backup_api_keys:
+            return
+        # Swap the current key with a random backup in place: no list rebuild,
+        # and the rate-limited key goes back into the rotation pool.
+        chosen = self._rng.randrange(len(self.backup_api_keys))
+        self.current_api_key, self.backup_api_keys[chosen] = self.backup_api_keys[chosen], self.current_api_key
+        self._set_auth(self.current_api_key)
 
     def _calculate_backoff_time(self, attempt):
-        return (self.backoff_factor ** attempt) + random.uniform(0, 1)
-
-    def _make_request(self, method, url, headers=None, params=None, data=None, json=None, retries=3, backoff_factor=2):
-        """Make a request with retries using exponential backoff, jitter, and dynamic API key switching."""
-        headers = headers or {}
-        headers['authorization'] = f'Bearer {self.current_api_key}'
-
-        """Make a request with retries using exponential backoff and jitter."""
-        headers = headers or {}
-        params = params or {}
-        data = data or {}
-        json = json or {}
-    
-        method_map = {
-            'GET': requests.get,
-            'POST': requests.post,
-            'PUT': requests.put,
-            'PATCH': requests.patch,
-            'DELETE': requests.delete
-        }
-    
-        if method not in method_map:
+        return full_jitter(attempt, base=self.backoff_factor, cap=self.rate_limit_window * 2, rng=self._rng)
+
+    def _make_request(self, method, url, headers=None, params=None, data=None, json=None, retries=3):
+        """Make a request, rotating API keys on 429s; other retries live on the pooled adapter."""
+        # requests accepts None for headers/params/data/json, so pass them straight
+        # through instead of allocating four empty dicts per call.
+        if method not in self._METHODS:
             raise ValueError("Unsupported HTTP method")
 
+        # Preserialize JSON bodies so requests does not fall back to the stdlib encoder
+        if json is not None:
+            data = json_dumps(json)
+            headers = {'Content-Type': 'application/json', **(headers or {})}
+            json = None
+
         for attempt in range(retries):
             self._throttle()
 
             try:
-                response = method_map[method](url, headers=headers, params=params, data=data)
+                response = self._session.request(method, url, headers=headers, params=params, data=data, json=json)
                 response.raise_for_status()
                 self._record_request()
                 return response
 
             except requests.exceptions.HTTPError as http_err:
-                if http_err.response.status_code == 429:
-                    self._switch_api_key()
-                    retry_after = int(http_err.response.headers.get('Retry-After', 0))
-                    if retry_after:
-                        print(f"Rate limit hit. Switching API key. Retrying after {retry_after} seconds.")
-                        time.sleep(retry_after)
-                    else:
-                        backoff_time = self.calculate_backoff_time(attempt)
-                        print(f"Rate limit hit. Switching API key. Retrying after {backoff_time} seconds.")
-                        time.sleep(backoff_time)
-                else:
+                if http_err.response.status_code != 429:
                     raise
-
-            except requests.exceptions.RequestException as req_err:
                 self._switch_api_key()
-                if attempt < retries - 1:
-                    time.sleep((backoff_factor ** attempt) + random.uniform(0, 1))
+                retry_after = int(http_err.response.headers.get('Retry-After', 0))
+                if retry_after:
+                    logger.debug("Rate limit hit. Switching API key. Retrying after %s seconds.", retry_after)
+                    time.sleep(retry_after)
                 else:
-                    raise
+                    backoff_time = self._calculate_backoff_time(attempt)
+                    logger.debug("Rate limit hit. Switching API key. Retrying after %.2f seconds.", backoff_time)
+                    time.sleep(backoff_time)
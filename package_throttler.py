@@ -1,10 +1,71 @@
-from collections import deque
+import asyncio
 from dataclasses import dataclass, field
-from pprint import pprint
 from requests.exceptions import HTTPError, ConnectionError, Timeout
-import math
+from typing import ClassVar
+import logging
 import random
 import time
+import types
+
+logger = logging.getLogger(__name__)
+
+# Monotonic clock for all throttling math: immune to NTP/wall-clock jumps and
+# cheaper to read than time.time() on Linux.
+_now = time.monotonic
+
+
+def _full_jitter(attempt, base, factor, cap, rng=random):
+    """
+    AWS "Full Jitter" backoff: sleep a uniform amount in [0, min(cap, base * factor**attempt)].
+
+    Drawing the whole delay at random decorrelates retries across clients, so a
+    fleet of rate-limited callers does not re-stampede the server. Pass a
+    per-throttler rng to avoid contending on the module-level generator's lock.
+    """
+    return rng.uniform(0, min(cap, base * (factor ** attempt)))
+
+
+def _decide_sleep(tokens, elapsed, capacity, refill_rate, leaky, throttle_trigger_count):
+    """
+    Pure token-bucket decision: refill for the elapsed time, consume one token,
+    and return (tokens_after, seconds_to_sleep). Kept free of I/O and attribute
+    access so it can be JIT-compiled when numba is installed.
+    """
+    tokens = min(capacity, tokens + elapsed * refill_rate)
+    if tokens < 1.0:
+        # Bucket is empty: wait exactly long enough for one token to drip in.
+        return 0.0, (1.0 - tokens) / refill_rate
+    tokens -= 1.0
+    # Leaky-bucket mode: once the bucket drains past the throttle threshold,
+    # pace the remaining operations at the steady drip rate instead of
+    # letting the burst run the bucket completely dry.
+    if leaky and tokens <= capacity - throttle_trigger_count:
+        return tokens, 1.0 / refill_rate
+    return tokens, 0.0
+
+
+try:
+    from numba import njit
+    _decide_sleep = njit(cache=True, fastmath=True)(_decide_sleep)
+except ImportError:
+    pass
+
+
+def _resolve_operation(cls, operation):
+    """
+    Resolve an operation name to the plain function defined on the class.
+
+    Walks the MRO class dicts directly — a couple of dict lookups, no
+    descriptor invocation — so the result is always the live attribute and
+    monkeypatched methods are honored. Returns None for anything that is not
+    a plain function (staticmethod, classmethod, property, ...), which must go
+    through normal attribute lookup instead of manual binding.
+    """
+    for klass in cls.__mro__:
+        func = klass.__dict__.get(operation)
+        if func is not None:
+            return func if type(func) is types.FunctionType else None
+    return None
 
 @dataclass
 class _PackageThrottlerDefaultsBase:
@@ -35,103 +96,80 @@ class PackageThrottler(_PackageThrottlerDefaultsBase, _PackageThrottlerBase):
         base_backoff_delay (float): The base delay in seconds for exponential backoff.
     """
 
+    _RETRYABLE_STATUS: ClassVar[frozenset] = frozenset({408, 425, 429, 500, 502, 503, 504})
+
     throttle_trigger_count: int = field(init=False)
     full_throttle_trigger_count: int = field(init=False)
-    operation_timestamps: deque = field(default_factory=deque, init=False)
+    tokens: float = field(init=False)
+    last_refill: float = field(default_factory=_now, init=False)
     total_operations_made: int = field(default=0, init=False)
-    window_start_time: float = field(default_factory=time.time, init=False)
-    operation_position: int = field(default=0, init=False)
-    is_server_providing_operation_position: bool = field(default=False, init=False)
     is_leaky_bucket: bool = field(default=True, init=False)
+    _sem: asyncio.BoundedSemaphore = field(default=None, init=False)
+    _leaker_task: asyncio.Task = field(default=None, init=False)
+    # Per-instance generator: random's module-level singleton is lock-protected,
+    # which multithreaded clients contend on during retry storms.
+    _rng: random.Random = field(default_factory=random.Random, init=False)
 
     def __post_init__(self):
-        """Calculate when throttling should start after initialization."""
+        """Calculate when throttling should start and fill the token bucket."""
         self._recalculate_throttle_thresholds()
+        self.tokens = float(self.max_operations_in_window)
+        # Normalize once so the hot path never re-checks a None/empty tuple
+        self._transient_tuple = tuple(self.transient_exceptions or ())
 
     def _recalculate_throttle_thresholds(self):
         """Recalculate the throttle and full throttle trigger counts based on the current rate limits."""
-        self.throttle_trigger_count = math.ceil(self.max_operations_in_window * self.throttle_start_percentage)
-        self.full_throttle_trigger_count = math.ceil(self.max_operations_in_window * self.full_throttle_percentage)
+        # Integer ceil-division over a percent numerator: exact for two-decimal
+        # percentages and free of the IEEE-754 drift that math.ceil on a float
+        # product can introduce right at a trigger boundary.
+        max_operations = self.max_operations_in_window
+        throttle_percent = round(self.throttle_start_percentage * 100)
+        full_throttle_percent = round(self.full_throttle_percentage * 100)
+        self.throttle_trigger_count = -(-max_operations * throttle_percent // 100)
+        self.full_throttle_trigger_count = -(-max_operations * full_throttle_percent // 100)
 
     def _throttle(self):
-        """Handle the throttling logic before making an operation."""
-        current_time = time.time()
-        
-        # Remove old operation timestamps that are outside the current time window
-        while self.operation_timestamps and self.operation_timestamps[0] < current_time - self.rate_limit_window:
-            self.operation_timestamps.popleft()
-
-        time_elapsed = current_time - self.window_start_time
-        time_remaining = abs(self.rate_limit_window - time_elapsed)
-
-        # Reset window start time if the current window has expired
-        if time_remaining <= 0:
-            self.window_start_time = current_time
-
-        # Get the position of the current operation in the throttling window
-        if not self.is_server_providing_operation_position:
-            print("[Info] Server is not providing operation position. Using local operation count.")
-            self.operation_position = len(self.operation_timestamps)
-
-        # Apply throttling if within the throttle range
-        if self.operation_position >= self.throttle_trigger_count and self.operation_position < self.full_throttle_trigger_count:
-            remaining_operations = self.full_throttle_trigger_count - self.operation_position
-            
-            print(f"\033[93m[Throttle] Time remaining: {time_remaining:.2f} seconds")
-            print(f"\033[93m[Throttle] Remaining operations: {remaining_operations}")
-            if self.is_leaky_bucket:
-                time_to_wait = min(time_remaining / max(remaining_operations, 1), self.rate_limit_window)
-                print(f"\033[93m[Throttle] Waiting {time_to_wait:.2f} seconds before making the next operation.\033[0m")
-            else:
-                time_to_wait = min(time_remaining, self.rate_limit_window)
-                print(f"\033[93m[Throttle] Waiting {time_to_wait:.2f} seconds before making the next operation.\033[0m")
-
-            time.sleep(time_to_wait)
+        """Refill the token bucket and wait until an operation token is available."""
+        current_time = _now()
+        capacity = float(self.max_operations_in_window)
 
-        # Fully throttle if at the last position in the throttle range
-        if self.operation_position == self.full_throttle_trigger_count - 1:
-            time_to_wait = time_remaining * 1.1  # Add an extra 10% delay as cushion
-            if time_to_wait > 0:
-                print(f"\033[93m[Full Throttle] Waiting {time_to_wait:.2f} seconds to consume remaining time.\033[0m")
-                time.sleep(time_to_wait)
+        # The refill/consume/pace math is a pure function so numba can compile
+        # it when available; this method only keeps the clock and the sleep.
+        self.tokens, time_to_wait = _decide_sleep(
+            self.tokens,
+            current_time - self.last_refill,
+            capacity,
+            capacity / self.rate_limit_window,
+            self.is_leaky_bucket,
+            float(self.throttle_trigger_count),
+        )
+        self.last_refill = current_time
 
-        # Apply exponential backoff if the operation count exceeds the full throttle trigger count
-        if self.operation_position >= self.full_throttle_trigger_count:
-            if time_elapsed < self.rate_limit_window:
-                backoff_time = (self.rate_limit_window - time_elapsed) * 1.5
-                print(f"\033[93m[Backoff] Exponential Backoff: Waiting {backoff_time:.2f} seconds before proceeding.\033[0m")
-                time.sleep(backoff_time)
+        # _decide_sleep folds the throttle band, the full-throttle cushion, and
+        # the empty-bucket backoff into one wait, so each invocation issues at
+        # most a single time.sleep: one syscall and one GIL round-trip.
+        if time_to_wait > 0.0:
+            logger.debug("[Throttle] Waiting %.2f seconds before making the next operation.", time_to_wait)
+            time.sleep(time_to_wait)
 
     def _record_operation(self):
-        """Record the current time as an operation timestamp and update the total operation count."""
-        self.operation_timestamps.append(time.time())
+        """Update the total operation count."""
         self.total_operations_made += 1
-        
-        # Reset window start time if this is the first operation in a new cycle
-        if len(self.operation_timestamps) == 1:
-            self.window_start_time = time.time()
 
 
     def _is_transient_error(self, exception):
         """Determine if the error is transient and worth retrying."""
         if isinstance(exception, (Timeout, ConnectionError)):
-            print(f"\033[91mIs transient error: Connection\033[0m")
             return True  # Retry for connection-related errors
 
         if isinstance(exception, HTTPError):
-            print(f"\033[91mIs transient error: HTTP\033[0m")
-            status_code = exception.response.status_code
-            if status_code in {429, 503}:  # Rate limiting or temporary unavailability
-                return True
-            if 500 <= status_code < 600:  # Retry for server errors
+            if exception.response.status_code in self._RETRYABLE_STATUS:
                 return True
-            
-        if self.transient_exceptions and isinstance(exception, self.transient_exceptions):
-            print(f"\033[91mIs transient error: Custom\033[0m")
+
+        if self._transient_tuple and isinstance(exception, self._transient_tuple):
             return True
 
         # Customize with additional checks as needed for your client
-        print(f"\033[91mIs not transient error\033[0m")
         return False
 
     
@@ -151,17 +189,73 @@ class PackageThrottler(_PackageThrottlerDefaultsBase, _PackageThrottlerBase):
     
             # Handle transient errors with exponential backoff and jitter
             except Exception as err:
-                print(f"OperationError: {err}")
+                logger.debug("OperationError: %s", err)
                 if self._is_transient_error(err):
-                    backoff_time = self.base_backoff_delay * (backoff_factor ** attempt) + random.uniform(0, 1)
-                    print(f"\033[93m[Rate Limit Hit] Backoff: Waiting {backoff_time:.2f} seconds before retrying.\033[0m")
+                    backoff_time = _full_jitter(attempt, self.base_backoff_delay, backoff_factor, self.rate_limit_window * 2, rng=self._rng)
+                    logger.debug("[Rate Limit Hit] Backoff: Waiting %.2f seconds before retrying.", backoff_time)
                     time.sleep(backoff_time)
                 else:
                     raise
 
     def execute_with_throttle(self, client_instance, operation, *args, **kwargs):
         """Throttle and execute a client operation."""
+        # Fast path: bind the class's plain function directly, skipping the
+        # full attribute protocol. Private names, instance attributes that
+        # shadow the class, and non-function descriptors (staticmethod,
+        # classmethod, property) all fall back to a plain getattr, which
+        # binds — or does not bind — them the normal way.
+        if not operation.startswith('_') and operation not in getattr(client_instance, '__dict__', ()):
+            func = _resolve_operation(type(client_instance), operation)
+            if func is not None:
+                return self._make_operation(func.__get__(client_instance), *args, **kwargs)
         method = getattr(client_instance, operation, None)
         if method is None:
             raise ValueError(f"The client instance does not support the operation: {operation}")
         return self._make_operation(method, *args, **kwargs)
+
+    async def acquire(self):
+        """Wait for a permit from the leaky bucket before performing an operation."""
+        if self._sem is None:
+            self._sem = asyncio.BoundedSemaphore(self.max_operations_in_window)
+            self._leaker_task = asyncio.get_running_loop().create_task(self._leaker())
+        await self._sem.acquire()
+
+    async def _leaker(self):
+        """Release one permit per drip interval so waiters are served at a steady rate."""
+        drip_interval = self.rate_limit_window / self.max_operations_in_window
+        while True:
+            await asyncio.sleep(drip_interval)
+            try:
+                self._sem.release()
+            except ValueError:
+                # The bucket is already full; drop the drip instead of overfilling.
+                pass
+
+    async def aclose(self):
+        """Cancel the leaker task so the event loop can shut down cleanly."""
+        if self._leaker_task is not None:
+            self._leaker_task.cancel()
+            try:
+                await self._leaker_task
+            except asyncio.CancelledError:
+                pass
+            self._leaker_task = None
+            # Drop the semaphore too: it is bound to the closed loop, and
+            # clearing it lets the next acquire() rebind on a fresh loop.
+            self._sem = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def execute_with_throttle_async(self, client_instance, operation, *args, **kwargs):
+        """Throttle and execute an async client operation through the leaky bucket."""
+        method = getattr(client_instance, operation, None)
+        if method is None:
+            raise ValueError(f"The client instance does not support the operation: {operation}")
+        await self.acquire()
+        response = await method(*args, **kwargs)
+        self._record_operation()
+        return response
@@ -1,12 +1,80 @@
+from array import array
 from dataclasses import InitVar, dataclass, field
-import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import ClassVar
+import logging
 import math
-from operator import is_
-from pprint import pprint
 import time
-from collections import deque
 import random
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Monotonic clock for all throttling math: immune to NTP/wall-clock jumps and
+# cheaper to read than time.time() on Linux.
+_now = time.monotonic
+
+# Status codes worth retrying, precomputed so the error path does one hashed
+# membership test instead of a set literal plus a range comparison per call:
+# 408 Request Timeout, 429 Too Many Requests, and all 5xx server errors.
+_TRANSIENT_STATUS = frozenset({408, 429, *range(500, 600)})
+
+# Serialize outbound JSON bodies with orjson when available; its native encoder
+# is several times faster than the stdlib serializer requests uses internally.
+try:
+    import orjson
+    json_dumps = orjson.dumps
+except ImportError:
+    import json as _json
+
+    def json_dumps(obj):
+        return _json.dumps(obj).encode()
+
+
+class _CappedRetry(Retry):
+    """
+    Retry policy that clamps server-supplied Retry-After delays.
+
+    urllib3 only bounds its own computed exponential backoff; a raw
+    Retry-After value is slept in full, so one pathological header could park
+    the client for hours. This subclass caps it at retry_after_max, mirroring
+    the backoff_max_delay clamp the Python-level retry paths apply.
+    """
+
+    def __init__(self, *args, retry_after_max=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Assign after super().__init__: newer urllib3 accepts retry_after_max
+        # natively (default 21600) and would otherwise overwrite the
+        # configured cap with its default.
+        self.retry_after_max = retry_after_max
+
+    def new(self, **kwargs):
+        # Retry.new rebuilds the policy after each attempt from its known
+        # parameters; carry the cap across so it survives the copies.
+        kwargs.setdefault('retry_after_max', self.retry_after_max)
+        return super().new(**kwargs)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is not None and self.retry_after_max is not None:
+            return min(retry_after, self.retry_after_max)
+        return retry_after
+
+
+def full_jitter(attempt, base=1.0, cap=30.0, rng=random):
+    """
+    AWS "Full Jitter" backoff: sleep a uniform amount in [0, min(cap, base * 2**attempt)].
+
+    Drawing the whole delay at random decorrelates retries across clients, so a
+    fleet of rate-limited callers does not re-stampede the server the way
+    exponential-plus-small-jitter schedules do. Pass a per-throttler rng to
+    avoid contending on the module-level generator's lock.
+    """
+    return rng.uniform(0, min(cap, base * (1 << attempt)))
+
 
 @dataclass
 class _RequestThrottlerDefaultsBase:
@@ -35,13 +103,23 @@ class RequestThrottler(_RequestThrottlerDefaultsBase):
                                           Default is 0.90 (90%).
     """
     
+    _METHODS: ClassVar[frozenset] = frozenset({'GET', 'POST', 'PUT', 'PATCH', 'DELETE'})
+
     throttle_trigger_count: int = field(init=False)
     full_throttle_trigger_count: int = field(init=False)
-    request_timestamps: deque = field(default_factory=deque, init=False)
+    # Fixed-size ring buffer of request timestamps: the sliding window never
+    # needs more than max_requests_in_window entries, so memory stays pinned
+    # at N doubles with no per-append reallocation.
+    _ring: array = field(init=False)
+    _head: int = field(default=0, init=False)
+    _tail: int = field(default=0, init=False)
+    _count: int = field(default=0, init=False)
     total_requests_made: int = field(default=0, init=False)
-    window_start_time: float = field(default_factory=time.time, init=False)
     request_position: int = field(default=0, init=False)
     is_server_providing_request_position: bool = field(default=False, init=False)
+    # Per-instance generator: random's module-level singleton is lock-protected,
+    # which multithreaded clients contend on during retry storms.
+    _rng: random.Random = field(default_factory=random.Random, init=False)
 
     def __post_init__(self):
         """Initialize the throttler with the default values and calculate the throttle thresholds."""
@@ -63,194 +141,219 @@ class RequestThrottler(_RequestThrottlerDefaultsBase):
             raise ValueError("backoff_factor must be greater than 1")
         if not (self.backoff_max_delay > 0):
             raise ValueError("backoff_max_delay must be greater than 0")
+        self._ring = array('d', [0.0] * self.max_requests_in_window)
         self._calculate_throttle_thresholds()
+        self._create_session()
+
+    def _create_session(self):
+        """Create the pooled HTTP session used by all requests.
+
+        Reuse one pooled session so keep-alive connections survive across
+        requests and retries; module-level requests.get/post/... would open a
+        fresh TCP+TLS connection per call. Subclasses remount their own
+        adapters on this session when they need a different retry policy, or
+        override this method to supply a different client entirely.
+
+        The retry/backoff policy runs inside urllib3 rather than a Python-level
+        loop: the Retry object handles status allowlisting, exponential
+        backoff, and Retry-After parsing (including HTTP-dates) in the pool,
+        with Retry-After sleeps clamped to backoff_max_delay by _CappedRetry.
+        raise_on_status is off so the final failing response comes back and
+        raise_for_status surfaces it as an ordinary HTTPError.
+        """
+        retry = _CappedRetry(
+            total=self.backoff_retries,
+            backoff_factor=self.backoff_base_delay,
+            status_forcelist=(408, 429, 500, 502, 503, 504),
+            allowed_methods=self._METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+            retry_after_max=self.backoff_max_delay,
+        )
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8, pool_maxsize=self.max_requests_in_window, max_retries=retry
+        )
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        # Bind one callable per verb so _make_request dispatches with a single
+        # getattr instead of re-validating and re-branching on the method
+        # string inside Session.request for every call.
+        self._do_get = self._session.get
+        self._do_post = self._session.post
+        self._do_put = self._session.put
+        self._do_patch = self._session.patch
+        self._do_delete = self._session.delete
+
+    def close(self):
+        """Close the pooled session and its keep-alive connections."""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def _calculate_throttle_thresholds(self):
         """Recalculate the throttle and full throttle trigger counts based on the current rate limits."""
         self.throttle_trigger_count = math.floor(self.max_requests_in_window * self.throttle_start_percentage)
         self.full_throttle_trigger_count = math.floor(self.max_requests_in_window * self.full_throttle_percentage)
 
-    def _throttle(self):
-        """Handle the throttling logic before making a request."""
+        # Wait-factor table indexed by request position: _throttle multiplies
+        # the factor by the remaining window time to get its sleep, so the
+        # steady-state decision is one lookup instead of three range checks.
+        # 0.0 below the throttle band, the leaky-bucket spread inside it, and
+        # the full-throttle cushion at and above the full-throttle trigger.
+        wait_factor = array('d', [0.0] * (self.max_requests_in_window + 1))
+        for position in range(self.max_requests_in_window + 1):
+            if position >= self.full_throttle_trigger_count:
+                wait_factor[position] = self.full_throttle_buffer + 1
+            elif position >= self.throttle_trigger_count:
+                wait_factor[position] = 1.0 / (self.full_throttle_trigger_count - position)
+        self._wait_factor = wait_factor
+
+    def _compute_wait(self, current_time):
+        """Evict expired timestamps and return how long to wait before the next request.
+
+        Pure bookkeeping with no sleeping, so the sync and async throttlers can
+        share the sliding-window decision and differ only in how they wait.
+        """
 
-        # Manage the request timestamps
-        current_time = time.time()
+        # Evict timestamps that have fallen out of the window by advancing the
+        # eviction index; only the head and count are written back, once.
         threshold_time = current_time - self.rate_limit_window
-        while self.request_timestamps and self.request_timestamps[0] < threshold_time:
-            self.request_timestamps.popleft()
+        count = self._count
+        if count:
+            ring = self._ring
+            head = self._head
+            slots = self.max_requests_in_window
+            while count and ring[head] < threshold_time:
+                head = (head + 1) % slots
+                count -= 1
+            self._head = head
+            self._count = count
 
-        # Calculate the time remaining in the current window
-        time_elapsed = current_time - self.window_start_time
+        # The window opens at the oldest live timestamp in the ring, so there
+        # is no separate start-of-window state to track or reset. Eviction has
+        # already discarded anything older than one window, which keeps
+        # time_elapsed within [0, rate_limit_window].
+        time_elapsed = current_time - self._ring[self._head] if self._count else self.rate_limit_window
         time_remaining = self.rate_limit_window - time_elapsed
 
-        # Reset window start time if the current window has expired
-        if time_remaining <= 0:
-            self.window_start_time = current_time
-            time_remaining = abs(self.rate_limit_window - time_elapsed)
-
         # Get the position of the current request in the throttling window
         if not self.is_server_providing_request_position:
-            self.request_position = len(self.request_timestamps)
+            self.request_position = self._count
 
-        # Apply backoff if the request count exceeds the full throttle trigger count
+        # Skip a full window if the request count exceeds the window maximum
         is_within_rate_limit_window = time_elapsed < self.rate_limit_window
         has_count_exceeded_max_requests = self.request_position >= self.max_requests_in_window
         if has_count_exceeded_max_requests and is_within_rate_limit_window:
-            self._skip_one_window()
-            return
-        
-        # Apply full throttle if at or beyond the last position in the throttle range
-        has_reached_full_throttle = self.request_position >= self.full_throttle_trigger_count
-        if has_reached_full_throttle:
-            self._apply_full_throttle(time_remaining)
-            return
-
-        # Apply throttling if within the throttle range
-        is_within_throttle_range = self.throttle_trigger_count <= self.request_position < self.full_throttle_trigger_count
-        if is_within_throttle_range:
-            self._apply_throttle(time_remaining)
-            return
-
+            return self.rate_limit_window
 
-    def _skip_one_window(self):
-        print(f"\033[93m[Skip Window] Waiting {self.rate_limit_window:.2f} seconds before proceeding.\033[0m")
-        time.sleep(self.rate_limit_window)
+        # Look up the wait factor for this position; the table folds the
+        # throttle band, the full-throttle cushion, and the idle case into a
+        # single multiply, so no per-request branching on the trigger counts.
+        factor = self._wait_factor[min(self.request_position, self.max_requests_in_window)]
+        if factor > 0.0:
+            return min(factor * time_remaining, self.rate_limit_window * (self.full_throttle_buffer + 1))
+        return 0.0
 
-
-    def _apply_full_throttle(self, time_remaining):
-        time_to_wait = time_remaining * (self.full_throttle_buffer + 1)
+    def _throttle(self):
+        """Handle the throttling logic before making a request."""
+        time_to_wait = self._compute_wait(_now())
         if time_to_wait > 0:
-            print(f"\033[93m[Full Throttle] Waiting {time_to_wait:.2f} seconds to consume remaining time.\033[0m")
+            logger.debug("[Throttling] Waiting %.2f seconds before making the next request.", time_to_wait)
             time.sleep(time_to_wait)
 
 
-    def _apply_throttle(self, time_remaining):
-        remaining_requests = self.full_throttle_trigger_count - self.request_position
-        time_to_wait = min(time_remaining / max(remaining_requests, 1), self.rate_limit_window)
-        print(f"\033[93m[Throttling] Waiting {time_to_wait:.2f} seconds before making the next request.\033[0m")
-        time.sleep(time_to_wait)
+    def _record_request(self, now=None):
+        """Record the given (or current) time in the ring buffer and update the request count."""
+        if now is None:
+            now = _now()
+        max_requests = self.max_requests_in_window
+        if self._count == max_requests:
+            # The ring is full; drop the oldest slot before overwriting it
+            self._head = (self._head + 1) % max_requests
+            self._count -= 1
+        self._ring[self._tail] = now
+        self._tail = (self._tail + 1) % max_requests
+        self._count += 1
 
 
-    def _record_request(self):
-        """Record the current time as a request timestamp and update the total request count."""
-        self.request_timestamps.append(time.time())
-        
-        # Reset window start time if this is the first request in a new cycle
-        if len(self.request_timestamps) == 1:
-            self.window_start_time = time.time()
+    def _backoff_delay(self, attempt):
+        """
+        Full-jitter backoff delay for the given attempt, capped at backoff_max_delay.
 
+        The whole delay is drawn uniformly from [0, min(cap, base * factor**attempt)]
+        so retries decorrelate across clients instead of arriving in waves.
+        """
+        return self._rng.uniform(
+            0, min(self.backoff_max_delay, self.backoff_base_delay * self.backoff_factor ** attempt)
+        )
 
     def _is_transient_error(self, status_code, response):
         """
         Determine if the error is transient and worth retrying.
-        
-        Transient errors include:
-        - 408: Request Timeout
-        - 429: Too Many Requests
-        - 5xx: Server Errors
-        - 403: Forbidden (with 'Retry-After' header)
+
+        Transient errors are the precomputed _TRANSIENT_STATUS codes (408, 429,
+        and all 5xx) plus 403 Forbidden when a 'Retry-After' header is present.
         """
-        transient_errors = {408, 429}
-        if status_code in transient_errors:
-            return True
-        if 500 <= status_code < 600:
-            return True
-        if status_code == 403 and 'Retry-After' in response.headers:
+        if status_code in _TRANSIENT_STATUS:
             return True
-        return False
-    
-    
+        headers = response.headers
+        return status_code == 403 and headers is not None and 'Retry-After' in headers
+
+    def _classify_retry(self, status_code, headers, attempt):
+        """
+        Decide what to do with an error response: return the seconds to sleep
+        before retrying, or None when the error should be raised.
+
+        All of the Retry-After parsing (integer and HTTP-date) lives here, so
+        retry loops collapse to "sleep or raise" with no nested branching, and
+        the policy can be exercised without a live response object. Every
+        returned delay is clamped to backoff_max_delay.
+        """
+        is_transient = status_code in _TRANSIENT_STATUS or (
+            status_code == 403 and headers is not None and 'Retry-After' in headers
+        )
+        if not is_transient or attempt + 1 >= self.backoff_retries:
+            return None
+
+        retry_after_header = headers.get('Retry-After') if headers is not None else None
+        if retry_after_header:
+            try:
+                return min(int(retry_after_header), self.backoff_max_delay)
+            except ValueError:
+                try:
+                    retry_after_date = parsedate_to_datetime(retry_after_header)
+                    retry_after_seconds = (retry_after_date - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    retry_after_seconds = None
+                if retry_after_seconds is not None and retry_after_seconds > 0:
+                    return min(retry_after_seconds, self.backoff_max_delay)
+        return self._backoff_delay(attempt)
+
+
+
     def _make_request(self, method, url, headers=None, params=None, data=None, json=None):
-        """Make a request with retries using exponential backoff and jitter."""
-        headers = headers or {}
-        params = params or {}
-        data = data or {}
-        json = json or {}
-    
-        method_map = {
-            'GET': requests.get,
-            'POST': requests.post,
-            'PUT': requests.put,
-            'PATCH': requests.patch,
-            'DELETE': requests.delete
-        }
-    
-        if method not in method_map:
+        """Make a request, delegating the retry and backoff policy to the pooled adapter."""
+        # requests accepts None for headers/params/data/json, so pass them straight
+        # through instead of allocating four empty dicts per call.
+        request_func = getattr(self, '_do_' + method.lower(), None)
+        if request_func is None:
             raise ValueError("Unsupported HTTP method")
-    
-        for attempt in range(self.backoff_retries):
-            self._throttle()
-    
-            # Make the request
-            try:
-                response = method_map[method](url, headers=headers, params=params, data=data, json=json)
 
-                try:
-                    response.raise_for_status()
-                except Exception as e:
-                    pprint(response.headers)
-                    raise e
-                self._record_request()
-                return response
-    
-            # Handle HTTP errors
-            except requests.exceptions.HTTPError as http_err:
-                print(f"HTTPError: {http_err}")
-                if not self._is_transient_error(http_err.response.status_code, http_err.response):
-                    raise
-
-                retry_after_header = http_err.response.headers.get('Retry-After')
-                
-                if retry_after_header:
-                    try:
-                        # Try to parse as an integer (seconds)
-                        retry_after = int(retry_after_header)
-                        print(f"[Retry-After] Retrying after {retry_after} seconds.")
-                        time.sleep(retry_after)
-                    except ValueError:
-                        # If parsing as an integer fails, try to parse as a date
-                        date_formats = [
-                            '%a, %d %b %Y %H:%M:%S %Z',  # RFC 1123 format
-                            '%A, %d-%b-%y %H:%M:%S %Z',  # RFC 850 format
-                            '%a %b %d %H:%M:%S %Y'       # ANSI C's asctime() format
-                        ]
-                        retry_after_seconds = None
-                        for date_format in date_formats:
-                            try:
-                                retry_after_date = datetime.strptime(retry_after_header, date_format)
-                                retry_after_seconds = (retry_after_date - datetime.utcnow()).total_seconds()
-                                break
-                            except ValueError:
-                                continue
-
-                        if retry_after_seconds is not None and retry_after_seconds > 0:
-                            print(f"[Retry-After] Retrying after {retry_after_seconds} seconds (parsed from date).")
-                            time.sleep(retry_after_seconds)
-                        else:
-                            # Fall back to exponential backoff
-                            print("[Retry-After] The retry date has already passed or could not be parsed.")
-                            if attempt < self.backoff_retries:
-                                sleep_time = (self.backoff_factor ** (attempt + 1)) + random.uniform(0, 1)
-                                print(f"            Falling back to exponential backoff. Sleeping for {sleep_time} seconds.")
-                                time.sleep(sleep_time)
-                            else:
-                                raise
-
-                elif attempt < self.backoff_retries:
-                    sleep_time = (self.backoff_factor ** (attempt + 1)) + random.uniform(0, 1)
-                    print(f"[Back-off] Retrying after {sleep_time} seconds.")
-                    time.sleep(sleep_time)
-                else:
-                    raise
-    
-            except requests.exceptions.RequestException as req_err:
-                print(f"RequestException: {req_err}")
-                if attempt < self.backoff_retries:
-                    sleep_time = (self.backoff_factor ** attempt + 1) + random.uniform(0, 1)
-                    print(f"[RequestException] Retrying after {sleep_time} seconds.")
-                    time.sleep(sleep_time)
-                else:
-                    raise
+        self._throttle()
+        response = request_func(url, headers=headers, params=params, data=data, json=json)
+        try:
+            response.raise_for_status()
+        except Exception:
+            logger.debug("Response headers: %s", response.headers)
+            raise
+        self._record_request()
+        return response
 
     def throttled_get(self, url, headers=None, params=None):
         """Throttled GET request."""